@@ -16,7 +16,7 @@ def connect(func):
     return wrapper
 
 
-def get_state(client):
+def get_state(client, namespace=None):
     """
     Sends a GET request to the server to retrieve the current state.
 
@@ -25,6 +25,8 @@ def get_state(client):
 
     Args:
         client: The client object used to send and receive messages from the server.
+        namespace (str or list): The registered object to fetch, None for the default one.
+            A list fetches several objects in one request, the data is then keyed by namespace.
 
     Returns:
         tuple: A tuple containing the data and information from the server's response, 
@@ -35,7 +37,8 @@ def get_state(client):
 
     message = Message(
         code=MessageCode.GET,
-        id=m_id
+        id=m_id,
+        namespace=namespace
     )
 
     response = send_request(client, message)
@@ -44,7 +47,7 @@ def get_state(client):
     return data, info  # Return processed data and information
 
 
-def update_state(client, update_data):
+def update_state(client, update_data, namespace=None):
     """
     Sends a PUT request to the server to update the state with new data.
 
@@ -55,6 +58,7 @@ def update_state(client, update_data):
     Args:
         client: The client object used to send and receive messages from the server.
         update_data (dict): The dictionary containing the data to be updated on the server.
+        namespace (str): The registered object to update, None for the default one.
 
     Returns:
         tuple: A tuple containing a boolean indicating success or failure (True/False), 
@@ -67,7 +71,8 @@ def update_state(client, update_data):
     message = Message(
         code=MessageCode.PUT,
         data=update_data,
-        id=m_id
+        id=m_id,
+        namespace=namespace
     )
 
     response = send_request(client, message)
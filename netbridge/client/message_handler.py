@@ -4,6 +4,9 @@ import base64
 from ..message import Message
 from ..message_code import MessageCode
 
+MESSAGE_DELIMITER = b"\n"  # Never part of the base64 alphabet, so it marks the end of a message
+DATA_SEPARATOR = b" "  # Never part of the base64 alphabet, separates a shared data segment
+
 def send_msg(client_socket, message: Message):
     """
     Sends an encoded message to the server via the provided client socket (synchronous).
@@ -15,14 +18,14 @@ def send_msg(client_socket, message: Message):
     """
     message.data = json.dumps(message.data)
     encoded = encode_msg(message)
-    client_socket.send(encoded)
+    client_socket.sendall(encoded + MESSAGE_DELIMITER)
 
 def recv_msg(client_socket) -> Message:
     """
     Receives an encoded message from the server via the provided client socket (synchronous).
 
-    This function blocks until the message is received from the server. It decodes the received message and 
-    returns the resulting `Message` object.
+    This function blocks until a complete message, terminated by `MESSAGE_DELIMITER`, is received from the server.
+    It decodes the received message and returns the resulting `Message` object.
 
     Args:
         client_socket: The socket object used to receive data from the server.
@@ -30,12 +33,16 @@ def recv_msg(client_socket) -> Message:
     Returns:
         Message: The decoded message object, or None if no data is received.
     """
-    encoded = client_socket.recv(1024)
-
-    if not encoded:
-        return None 
+    chunks = []
+    while True:
+        chunk = client_socket.recv(65536)
+        if not chunk:
+            return None  # Connection closed before a full message
+        chunks.append(chunk)
+        if chunk.endswith(MESSAGE_DELIMITER):
+            break
 
-    return decode_msg(encoded)
+    return decode_msg(b"".join(chunks))
 
 def encode_msg(message: Message) -> bytes:
     """
@@ -54,6 +61,9 @@ def decode_msg(encoded) -> Message:
     """
     Decodes a base64-encoded byte string into a Message object (synchronous).
 
+    If the message is followed by a shared data segment (see `DATA_SEPARATOR`),
+    the segment is decoded into the message data.
+
     Args:
         encoded (bytes): The base64-encoded byte string.
 
@@ -61,8 +71,12 @@ def decode_msg(encoded) -> Message:
         Message: The decoded message, or None if there is an error.
     """
     try:
+        encoded, _, encoded_data = encoded.strip().partition(DATA_SEPARATOR)
         pickled = base64.b64decode(encoded)
-        return pickle.loads(pickled) 
+        message = pickle.loads(pickled)
+        if encoded_data:
+            message.data = base64.b64decode(encoded_data).decode()
+        return message
     except (pickle.UnpicklingError, base64.binascii.Error, TypeError) as e:
         print(f"Error decoding message: {e}")
         return None
@@ -9,6 +9,7 @@ class Message:
     code: MessageCode = None
     data: str = None
     id: UUID = None
+    namespace: str | list = None  # Registered object(s) addressed, None for the default one
 
 
 
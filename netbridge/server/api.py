@@ -2,49 +2,121 @@ from .server import Server
 
 
 import asyncio
+import threading
+from contextlib import contextmanager
 
-def start_server(func):
-    def wrapper(self):
-        # Create an instance of the server with access to self (instance of A)
-        server = Server(self)
+# Servers currently running in this process, keyed by (host, port).
+# Each entry holds the server, its check function and the thread pumping its loop.
+running_servers = {}
+
+@contextmanager
+def serve(server):
+    """
+    Runs `server` on a new event loop for the duration of the `with` block.
+
+    Yields the `check_client_messages` function that pumps the event loop.
+    Objects can be added with `server.register(namespace, instance)` before or
+    while the server runs; they are all served by the same listener and loop.
+    """
+    async def run_server():
+        """Start the asyncio server and keep it running."""
+        await server.start()
+
+    # Create a new event loop
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    # Start the server as a background task
+    server_task = loop.create_task(run_server())
 
-        async def run_server():
-            """Start the asyncio server and keep it running."""
-            await server.start()
+    # Allow some time for the server to start
+    while not server.is_running():
+        loop.run_until_complete(asyncio.sleep(0.1))
 
-        # Create a new event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    def check_client_messages():
+        """This function can be called inside the while loop to check messages."""
+        server.bump_version()  # The host may have changed its state since the last check
+        loop.run_until_complete(asyncio.sleep(0))  # Allow event loop to process messages
 
-        # Start the server as a background task
-        server_task = loop.create_task(run_server())
+    running_servers[(server.host, server.port)] = (server, check_client_messages, threading.get_ident())
 
-        # Allow some time for the server to start
-        while not server.is_running():
-            loop.run_until_complete(asyncio.sleep(0.1))
+    try:
+        yield check_client_messages
+    finally:
+        # If the block finishes, stop the server and clean up
+        print("Shutting down server...")
+        running_servers.pop((server.host, server.port), None)
 
-        def check_client_messages():
-            """This function can be called inside the while loop to check messages."""
-            loop.run_until_complete(asyncio.sleep(0))  # Allow event loop to process messages
+        # Cancel the server task
+        server_task.cancel()
 
         try:
-            # Call the original function, passing the check function
-            func(self, check_client_messages)
-        finally:
-            # If func(self) finishes, stop the server and clean up
-            print("Shutting down server...")
+            loop.run_until_complete(server_task)
+        except asyncio.CancelledError:
+            pass  # Task was cancelled, ignore error
+
+        server.close()
+
+        # Let the remaining client and snapshot tasks finish cancelling before the loop closes
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+        # Close the event loop properly
+        loop.close()
+        print("Server stopped.")
 
-            # Cancel the server task
-            server_task.cancel()
+def start_server(func=None, *, namespace=None, **server_kwargs):
+    """
+    Decorator that serves the instance for the duration of the decorated method.
 
+    Can be used as `@start_server` or with server options, for example
+    `@start_server(executor="fork")` to encode GET responses in a forked child.
+
+    With `namespace`, the instance is registered under that name. If a server is
+    already running on the same host and port on this thread (the decorated method
+    is called from inside another one), the instance is registered on that server
+    for the duration of the call and shares its listener and event loop. Joining
+    a server pumped by another thread, or with options that differ from the
+    running server's, raises an error.
+    """
+    if func is None:
+        return lambda f: start_server(f, namespace=namespace, **server_kwargs)
+    if not callable(func):
+        raise TypeError(f"start_server options are keyword-only, use @start_server(namespace={func!r}).")
+
+    def wrapper(self):
+        address = (server_kwargs.get("host", "localhost"), server_kwargs.get("port", 8765))
+
+        if address in running_servers:
+            # Join the running server instead of starting a second loop
+            server, check_client_messages, thread_id = running_servers[address]
+            if thread_id != threading.get_ident():
+                raise RuntimeError(
+                    f"The server on {address} is pumped by another thread, "
+                    "register the instance with server.register() on that thread instead."
+                )
+            conflicts = {
+                key: value for key, value in server_kwargs.items()
+                if key not in ("host", "port") and server.options.get(key) != value
+            }
+            if conflicts:
+                raise ValueError(f"The server on {address} is already running with other options: {conflicts}")
+
+            server.register(namespace, self)
             try:
-                loop.run_until_complete(server_task)
-            except asyncio.CancelledError:
-                pass  # Task was cancelled, ignore error
+                func(self, check_client_messages)
+            finally:
+                server.unregister(namespace)
+            return
 
-            # Close the event loop properly
-            loop.close()
-            print("Server stopped.")
+        # Create an instance of the server with access to self (instance of A)
+        server = Server(**server_kwargs)
+        server.register(namespace, self)
 
-    return wrapper
+        with serve(server) as check_client_messages:
+            # Call the original function, passing the check function
+            func(self, check_client_messages)
 
+    return wrapper
@@ -4,6 +4,10 @@ import base64
 from ..message import Message
 from ..message_code import MessageCode
 
+MESSAGE_DELIMITER = b"\n"  # Never part of the base64 alphabet, so it marks the end of a message
+DATA_SEPARATOR = b" "  # Never part of the base64 alphabet, separates a shared data segment
+MAX_MESSAGE_SIZE = 2 ** 20  # Largest message the server reads, client requests are small
+
 async def send_msg(writer, message: Message):
     """
     Sends an encoded message to the provided writer (synchronous).
@@ -17,25 +21,42 @@ async def send_msg(writer, message: Message):
         message (Message): The message to send, which will be encoded before sending.
     """
     encoded = encode_msg(message)
-    writer.write(encoded)  # Write the encoded message to the writer
+    send_encoded(writer, encoded)
+
+
+def send_encoded(writer, encoded: bytes):
+    """
+    Sends an already encoded message to the provided writer.
+
+    Args:
+        writer: The writer object used to send data.
+        encoded (bytes): The message as returned by `encode_msg`.
+    """
+    writer.write(encoded + MESSAGE_DELIMITER)  # Write the encoded message to the writer
 
 
 async def recv_msg(reader) -> Message:
     """
     Receives an encoded message from the provided reader (synchronous).
 
-    This function blocks until the message is received from the reader.
-    It decodes the received message and returns the resulting `Message` object.
+    This function blocks until a complete message, terminated by
+    `MESSAGE_DELIMITER`, is received from the reader. It decodes the received
+    message and returns the resulting `Message` object.
 
     Args:
         reader: The reader object (e.g., a socket or file-like object) used to receive data (synchronous).
 
     Returns:
-        Message: The decoded message object, or None if no data is received.
+        Message: The decoded message object, or None if no data is received or
+        the message is larger than `MAX_MESSAGE_SIZE`.
     """
-    encoded = await reader.read(1024)  # Read data from the reader synchronously
-    if not encoded:
-        return None  # Return None if no data is received
+    try:
+        encoded = await reader.readline()  # Read up to and including the delimiter
+    except ValueError:
+        print(f"Message larger than {MAX_MESSAGE_SIZE} bytes, closing the connection.")
+        return None
+    if not encoded.endswith(MESSAGE_DELIMITER):
+        return None  # Return None if the connection closed before a full message
 
     return decode_msg(encoded)  # Decode and return the message
 
@@ -57,6 +78,41 @@ def encode_msg(message: Message) -> bytes:
     return base64.b64encode(pickled)  # Base64 encode the serialized data
 
 
+def encode_data(data) -> bytes:
+    """
+    Serializes data to JSON and encodes it as a shared data segment.
+
+    The segment does not depend on the message it is sent with, so one
+    encoding can be reused for every client requesting the same data.
+
+    Args:
+        data (dict or list): The Python object to encode.
+
+    Returns:
+        bytes: The base64-encoded JSON string of `data`.
+    """
+    return base64.b64encode(dump_data(data).encode())
+
+
+def encode_shared_msg(message: Message, encoded_data: bytes) -> bytes:
+    """
+    Encodes a `Message` whose data is sent as an already encoded shared segment.
+
+    The message itself is encoded without its data, followed by
+    `DATA_SEPARATOR` and the segment from `encode_data`. The client restores
+    the data when decoding, so only the small message part is encoded per client.
+
+    Args:
+        message (Message): The message to encode, its data is ignored.
+        encoded_data (bytes): The shared data segment from `encode_data`.
+
+    Returns:
+        bytes: The encoded message followed by the shared data segment.
+    """
+    message.data = None
+    return encode_msg(message) + DATA_SEPARATOR + encoded_data
+
+
 def decode_msg(encoded) -> Message:
     """
     Decodes a base64-encoded byte string into a `Message` object.
@@ -77,7 +133,7 @@ def decode_msg(encoded) -> Message:
         print(f"Error decoding message: {e}")  # Print error if decoding fails
         return None
 
-def handle_message(message: Message, cls_instance) -> Message:
+def handle_message(message: Message, instances: dict) -> Message:
     """
     Handles incoming messages and routes them based on their message code.
 
@@ -86,34 +142,85 @@ def handle_message(message: Message, cls_instance) -> Message:
     - Calls `handle_put` for PUT requests.
     - Calls `handle_invalid` for unknown codes.
 
+    The message namespace selects the registered instance to operate on and
+    must have been validated with `check_namespace`.
+    A GET may address a list of namespaces to fetch several states at once.
+
     Args:
         message (Message): The incoming message object.
-        cls_instance: The instance of the class to operate on.
+        instances (dict): The registered instances, keyed by namespace.
 
     Returns:
         Message: A response message based on the processed request.
     """
     match message.code:
         case MessageCode.GET:
-            return handle_get(cls_instance, message.id)
+            return handle_get(instances, message.namespace, message.id)
         case MessageCode.PUT:
-            return handle_put(message.data, cls_instance, message.id)
+            return handle_put(message.data, instances[message.namespace], message.id)
         case _:
             return handle_invalid(message.id)
 
-def handle_get(cls_instance, m_id) -> Message:
+def check_namespace(message: Message, instances: dict) -> Message:
+    """
+    Validates the namespace addressed by a message.
+
+    A message addresses either the default namespace (None), a single named
+    namespace, or, for GET only, a non-empty list of named namespaces.
+
+    Args:
+        message (Message): The incoming message object.
+        instances (dict): The registered instances, keyed by namespace.
+
+    Returns:
+        Message: An error response if the namespace is invalid, otherwise None.
     """
-    Handles GET requests by returning the serialized state of cls_instance.
+    namespace = message.namespace
+    if isinstance(namespace, list):
+        if message.code == MessageCode.PUT:
+            return handle_invalid_namespace("PUT addresses a single namespace.", message.id)
+        if not namespace or not all(isinstance(ns, str) for ns in namespace):
+            return handle_invalid_namespace("A batched request addresses a non-empty list of named namespaces.", message.id)
+        addressed = namespace
+    elif namespace is None or isinstance(namespace, str):
+        addressed = [namespace]
+    else:
+        return handle_invalid_namespace("A namespace is a string, or None for the default one.", message.id)
+
+    unknown = [ns for ns in addressed if ns not in instances]
+    if unknown:
+        return handle_invalid_namespace(f"Unknown namespace(s): {unknown}", message.id)
+    return None
+
+def get_state(instances: dict, namespace):
+    """
+    Collects the state of the instance(s) addressed by `namespace`.
 
     Args:
-        cls_instance: The instance whose data should be retrieved.
+        instances (dict): The registered instances, keyed by namespace.
+        namespace (str or list): A single namespace or a list of namespaces.
 
     Returns:
-        Message: A response containing the serialized data of cls_instance.
+        dict: The `to_dict()` of a single instance, or a dict of them keyed by namespace for a list.
+    """
+    if isinstance(namespace, list):
+        return {ns: instances[ns].to_dict() for ns in namespace}
+    return instances[namespace].to_dict()
+
+def handle_get(instances: dict, namespace, m_id) -> Message:
+    """
+    Handles GET requests by returning the serialized state of the addressed instance(s).
+
+    Args:
+        instances (dict): The registered instances, keyed by namespace.
+        namespace (str or list): The namespace(s) whose data should be retrieved.
+
+    Returns:
+        Message: A response containing the serialized data of the instance(s).
     """
     return Message(
         code=MessageCode.OK,
-        data=dump_data(cls_instance.to_dict()),
+        data=dump_data(get_state(instances, namespace)),
         id=m_id
     )
 
@@ -154,7 +261,21 @@ def handle_invalid(m_id) -> Message:
     """
     return Message(
         code=MessageCode.ERROR,
-        data=dump_data("Invalid message code.")
+        data=dump_data("Invalid message code."),
+        id=m_id
+    )
+
+def handle_invalid_namespace(reason, m_id) -> Message:
+    """
+    Handles requests addressing an invalid or unregistered namespace.
+
+    Returns:
+        Message: An error response message with the reason.
+    """
+    return Message(
+        code=MessageCode.ERROR,
+        data=dump_data(reason),
+        id=m_id
     )
 
 def load_data(data):
@@ -1,19 +1,170 @@
 import asyncio
-from .message_handler import handle_message, send_msg, recv_msg
+import os
+import signal
+import traceback
+from ..message import Message
+from ..message_code import MessageCode
+from .message_handler import handle_message, send_msg, send_encoded, recv_msg, MAX_MESSAGE_SIZE, encode_data, encode_shared_msg, get_state, check_namespace
+
+
+def fork_snapshot(instances: dict, namespace):
+    """
+    Forks a child process that encodes the state of `namespace`.
+
+    The child gets a copy-on-write image of the host's memory at the moment of
+    the fork, which is the snapshot, so the host thread only pays for the fork
+    itself. The child calls `to_dict()`, encodes the data and writes it to a
+    pipe. Only the calling thread is copied into the child, so the host must
+    not run other threads.
+
+    Args:
+        instances (dict): The registered instances, keyed by namespace.
+        namespace (str or list): The namespace(s) whose data should be encoded.
+
+    Returns:
+        tuple: The pid of the child and the read end of its pipe.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: write the data and exit without returning into the event loop
+        status = 1
+        try:
+            os.close(read_fd)
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(encode_data(get_state(instances, namespace)))
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    return pid, read_fd
 
 
 class Server:
-    def __init__(self, instance, host="localhost", port=8765):
+    def __init__(self, instance=None, host="localhost", port=8765, executor=None):
         self.host = host
         self.port = port
-        print(instance)
-        self.instance = instance
+        self.instances = {}  # Registered instances, keyed by namespace
         self.running = False
         self.clients = set()  # Track active client connections
 
+        # Executor mode: with "fork", GET responses are encoded in a forked child instead of on the host thread
+        if executor not in (None, "fork"):
+            raise ValueError(f"Unknown executor mode: {executor!r}")
+        if executor == "fork" and not hasattr(os, "fork"):
+            raise ValueError("The fork mode needs os.fork, which is not available on this platform.")
+        self.fork = executor == "fork"
+        self.options = {"executor": executor}  # Compared when joining a running server
+
+        # The host can only change the state between two pumps of the loop or by a PUT,
+        # so GETs of the same version share one snapshot and its encoding
+        self.state_version = 0
+        self.snapshot_futures = {}  # Keyed by (state version, namespace)
+        self.snapshot_tasks = set()  # Tasks reading a child's encoded data
+        self.snapshot_pids = set()  # Children that have not been reaped yet
+
+        if instance is not None:
+            self.register(None, instance)  # The default namespace
+
     def is_running(self):
         return self.running
 
+    def register(self, namespace, instance):
+        """
+        Registers an instance to be served under `namespace`.
+
+        Must be called from the thread that pumps the server, like `to_dict()`
+        and `from_dict()` are.
+
+        Args:
+            namespace (str): The name clients use to address the instance, None for the default one.
+            instance: An object with `to_dict` and `from_dict` methods.
+        """
+        if namespace in self.instances:
+            raise ValueError(f"Namespace {namespace!r} is already registered.")
+        self.instances[namespace] = instance
+        self.bump_version()
+
+    def unregister(self, namespace):
+        """Stops serving the instance registered under `namespace`."""
+        del self.instances[namespace]
+        self.bump_version()
+
+    def bump_version(self):
+        """Marks the instance state as possibly changed since the last snapshot."""
+        self.state_version += 1
+
+    def get_snapshot_data(self, namespace):
+        """
+        Returns a future resolving to the encoded data of `namespace` at the current state version.
+
+        The first GET of a version forks the snapshot right away, later GETs
+        of the same namespace(s) and version await the same future. Snapshots
+        of older versions are never handed out, even while still encoding.
+        """
+        key = (self.state_version, tuple(namespace) if isinstance(namespace, list) else namespace)
+        if key not in self.snapshot_futures:
+            # Older versions are only awaited by the GETs that started them
+            self.snapshot_futures = {
+                k: f for k, f in self.snapshot_futures.items() if k[0] == self.state_version
+            }
+            pid, read_fd = fork_snapshot(self.instances, namespace)
+            self.snapshot_pids.add(pid)
+            task = asyncio.ensure_future(self.read_snapshot(pid, read_fd))
+            self.snapshot_tasks.add(task)
+            task.add_done_callback(self.snapshot_tasks.discard)
+            self.snapshot_futures[key] = task
+
+        return self.snapshot_futures[key]
+
+    async def read_snapshot(self, pid, read_fd) -> bytes:
+        """
+        Reads the encoded data of a child started by `fork_snapshot` and reaps it.
+
+        Returns:
+            bytes: The encoded data, as returned by `encode_data`.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb")
+        )
+        try:
+            data = await reader.read()  # Until the child closes the pipe
+        finally:
+            transport.close()
+
+        # Poll instead of waiting in a helper thread, so no thread is copied into later forks
+        while True:
+            reaped, status = os.waitpid(pid, os.WNOHANG)
+            if reaped:
+                break
+            await asyncio.sleep(0.001)
+        self.snapshot_pids.discard(pid)
+
+        exit_code = os.waitstatus_to_exitcode(status)
+        if exit_code != 0:
+            raise RuntimeError(f"Snapshot process exited with status {exit_code}.")
+        return data
+
+    async def encode_get(self, message: Message) -> bytes:
+        """
+        Builds and encodes the GET response for `message` from the shared encoded data.
+
+        Only the small response message, which carries the request id, is
+        encoded per client. The data segment is the same for every client.
+        """
+        # Shielded so a disconnecting client does not cancel the shared snapshot
+        encoded_data = await asyncio.shield(self.get_snapshot_data(message.namespace))
+        response = Message(
+            code=MessageCode.OK,
+            id=message.id
+        )
+        return encode_shared_msg(response, encoded_data)
+
     async def handle_client(self, reader, writer):
         addr = writer.get_extra_info('peername')
         print(f"New connection from {addr}")
@@ -26,9 +177,20 @@ class Server:
 
                 msg = await recv_msg(reader)
                 if not msg: # Client disconnected
-                    break  
+                    break
 
-                new_msg = handle_message(msg, self.instance)
+                error = check_namespace(msg, self.instances)
+                if error:
+                    await send_msg(writer, error)
+                    continue
+
+                if msg.code == MessageCode.GET and self.fork:
+                    send_encoded(writer, await self.encode_get(msg))
+                    continue
+
+                new_msg = handle_message(msg, self.instances)
+                if msg.code == MessageCode.PUT:
+                    self.bump_version()
                 await send_msg(writer, new_msg)
 
         except asyncio.CancelledError:
@@ -37,14 +199,32 @@ class Server:
             # Remove client from active set when disconnected
             self.clients.discard(writer)
             writer.close()
-            await writer.wait_closed()
+            try:
+                await writer.wait_closed()
+            except asyncio.CancelledError:
+                pass  # Server is shutting down, the connection is closed anyway
             print(f"Connection from {addr} closed.")
 
     async def start(self):
-        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        server = await asyncio.start_server(self.handle_client, self.host, self.port, limit=MAX_MESSAGE_SIZE)
+        if self.fork:
+            # Resolving the host started the loop's default executor thread, join it so forks copy a single thread
+            await asyncio.get_running_loop().shutdown_default_executor()
         print(f"Server is listening on {self.host}:{self.port}...")
         self.running = True
 
         async with server:
             await server.serve_forever()
 
+    def close(self):
+        """Cancels the snapshots in flight, and kills and reaps their children."""
+        for task in self.snapshot_tasks:
+            task.cancel()
+        for pid in self.snapshot_pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass  # Already exited, reap it below
+            os.waitpid(pid, 0)
+        self.snapshot_pids.clear()
+        self.running = False